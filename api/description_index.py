@@ -0,0 +1,105 @@
+##################################################################################################
+### INDEX DE RECHERCHE DES DESCRIPTIONS DE CARACTÉRISTIQUES
+##################################################################################################
+
+"""
+Index inversé en mémoire sur les colonnes Row, Table et Description de HomeCredit_columns_description.csv:
+- recherche par token exact et par préfixe (vocabulaire trié + recherche dichotomique)
+- classement par score pondéré (champ, rareté du token, correspondance exacte du nom de la variable)
+- accès direct par nom de variable, sans écrasement des doublons de Row provenant de tables différentes
+"""
+
+import bisect
+import math
+import re
+from collections import defaultdict
+
+# Poids des champs dans le score: le nom de la variable compte plus que sa table ou sa description
+FIELD_WEIGHTS = {"Row": 3.0, "Table": 1.0, "Description": 1.0}
+
+# Une correspondance par préfixe compte moins qu'un token exact
+PREFIX_WEIGHT = 0.5
+
+# Bonus lorsque la requête correspond exactement au nom de la variable
+EXACT_ROW_BONUS = 10.0
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    # Les noms de variables (AMT_CREDIT_SUM) sont découpés sur "_" comme le texte libre
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class DescriptionIndex:
+
+    def __init__(self, entries):
+        # entries: liste de dicts {"Row", "Table", "Description", "Special"}
+        self.entries = entries
+        self.postings = defaultdict(dict)  # token -> {indice d'entrée: poids cumulé des champs}
+        self.by_row = defaultdict(list)    # nom de variable en minuscules -> indices d'entrées
+
+        for position, entry in enumerate(entries):
+            self.by_row[entry["Row"].strip().lower()].append(position)
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(entry[field]):
+                    self.postings[token][position] = self.postings[token].get(position, 0.0) + weight
+
+        self.vocabulary = sorted(self.postings)
+
+    @classmethod
+    def from_dataframe(cls, df_columns_description):
+        columns = ["Table", "Row", "Description", "Special"]
+        frame = df_columns_description[columns].dropna(subset=["Row", "Description"])
+        frame = frame.astype(object).where(frame.notna(), None)
+        # Certains noms de variables contiennent des espaces superflus (ex: "SK_ID_PREV ")
+        frame["Row"] = frame["Row"].str.strip()
+        return cls(frame.to_dict(orient="records"))
+
+    def _idf(self, token):
+        return math.log(1 + len(self.entries) / len(self.postings[token]))
+
+    def _prefix_tokens(self, prefix):
+        # Tokens du vocabulaire commençant par le préfixe (plage contiguë du vocabulaire trié)
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\uffff")
+        return self.vocabulary[start:end]
+
+    def search(self, query, limit=20):
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        scores = defaultdict(float)
+        matched = defaultdict(set)
+        for query_token in query_tokens:
+            for token in self._prefix_tokens(query_token):
+                weight = 1.0 if token == query_token else PREFIX_WEIGHT
+                idf = self._idf(token)
+                for position, field_weight in self.postings[token].items():
+                    scores[position] += weight * field_weight * idf
+                    matched[position].add(query_token)
+
+        # Tous les tokens de la requête doivent être trouvés (exactement ou par préfixe)
+        required = set(query_tokens)
+        normalized_query = query.strip().lower()
+        results = []
+        for position, score in scores.items():
+            if matched[position] != required:
+                continue
+            entry = self.entries[position]
+            if entry["Row"].strip().lower() == normalized_query:
+                score += EXACT_ROW_BONUS
+            results.append((score, position))
+
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return [
+            {"Row": self.entries[position]["Row"], "Table": self.entries[position]["Table"], "score": round(score, 4)}
+            for score, position in results[:limit]
+        ]
+
+    def lookup(self, row):
+        # Toutes les entrées portant ce nom de variable (une par table)
+        return [self.entries[position] for position in self.by_row.get(row.strip().lower(), [])]
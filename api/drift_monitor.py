@@ -0,0 +1,164 @@
+##################################################################################################
+### SUIVI DE LA DÉRIVE DE LA POPULATION SCORÉE
+##################################################################################################
+
+"""
+Statistiques incrémentales sur les caractéristiques servies et les probabilités prédites:
+- comptages, moyenne et variance mises à jour en O(1) (algorithme de Welford), sans historique stocké
+- histogrammes à bornes fixes, définies une fois pour toutes sur la population de référence
+- PSI (Population Stability Index) entre la population scorée et la population de référence
+"""
+
+import threading
+import numpy as np
+
+# Petite valeur pour éviter log(0) et les divisions par zéro dans le calcul du PSI
+PSI_EPSILON = 1e-4
+
+# Seuils usuels d'interprétation du PSI
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+###############################################################################################################
+# BORNES ET HISTOGRAMMES
+
+def quantile_bin_edges(values, n_bins=10):
+    # Bornes des déciles de la référence, ouvertes aux extrémités pour capter les valeurs hors plage
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return np.array([-np.inf, np.inf])
+    inner_edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+    return np.concatenate(([-np.inf], inner_edges, [np.inf]))
+
+
+def fixed_bin_edges(low, high, n_bins=10):
+    # Bornes régulières (ex: probabilité entre 0 et 1)
+    return np.linspace(low, high, n_bins + 1)
+
+
+def bin_index(edges, value):
+    # Indice du bin contenant la valeur (les valeurs hors bornes sont rangées dans le bin extrême)
+    index = int(np.searchsorted(edges, value, side="right")) - 1
+    return min(max(index, 0), len(edges) - 2)
+
+
+def population_stability_index(expected, actual):
+    expected = np.clip(np.asarray(expected, dtype=np.float64), PSI_EPSILON, None)
+    actual = np.clip(np.asarray(actual, dtype=np.float64), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def psi_level(psi):
+    if psi is None:
+        return None
+    if psi < PSI_MODERATE:
+        return "stable"
+    if psi < PSI_SIGNIFICANT:
+        return "modéré"
+    return "significatif"
+
+
+###############################################################################################################
+# STATISTIQUES INCRÉMENTALES
+
+class RunningStats:
+    # Statistiques en ligne d'une variable: comptages, moyenne/variance de Welford et histogramme fixe
+
+    def __init__(self, edges, reference_fractions):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.reference_fractions = np.asarray(reference_fractions, dtype=np.float64)
+        self.histogram = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @classmethod
+    def from_reference(cls, reference_values, edges):
+        reference_values = np.asarray(reference_values, dtype=np.float64)
+        reference_values = reference_values[np.isfinite(reference_values)]
+        # Même règle d'affectation aux bins que pour les mises à jour en ligne
+        indices = np.clip(np.searchsorted(edges, reference_values, side="right") - 1, 0, len(edges) - 2)
+        counts = np.bincount(indices, minlength=len(edges) - 1)
+        total = counts.sum()
+        fractions = counts / total if total else np.full(len(edges) - 1, 1.0 / (len(edges) - 1))
+        return cls(edges, fractions)
+
+    def update(self, value):
+        # Mise à jour en O(1): aucune valeur individuelle n'est conservée
+        if value is None or not np.isfinite(value):
+            self.missing += 1
+            return
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.histogram[bin_index(self.edges, value)] += 1
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    def psi(self):
+        if self.count == 0:
+            return None
+        return population_stability_index(self.reference_fractions, self.histogram / self.count)
+
+    def to_dict(self):
+        psi = self.psi()
+        return {
+            "count": self.count,
+            "missing": self.missing,
+            "mean": self.mean if self.count else None,
+            "variance": self.variance,
+            "bin_edges": [None if not np.isfinite(edge) else float(edge) for edge in self.edges],
+            "histogram": self.histogram.tolist(),
+            "reference_fractions": self.reference_fractions.tolist(),
+            "psi": psi,
+            "psi_level": psi_level(psi),
+        }
+
+
+###############################################################################################################
+# MONITEUR DE DÉRIVE
+
+class DriftMonitor:
+    # Regroupe les statistiques des caractéristiques suivies et de la probabilité prédite
+
+    def __init__(self, feature_stats, probability_stats):
+        self.feature_stats = feature_stats
+        self.probability_stats = probability_stats
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_reference(cls, reference_df, features, reference_probabilities, n_bins=10):
+        # Instantané de référence: population d'entraînement/échantillon client et ses probabilités
+        feature_stats = {
+            feature: RunningStats.from_reference(
+                reference_df[feature].to_numpy(dtype=np.float64),
+                quantile_bin_edges(reference_df[feature].to_numpy(dtype=np.float64), n_bins),
+            )
+            for feature in features
+        }
+        probability_stats = RunningStats.from_reference(reference_probabilities, fixed_bin_edges(0.0, 1.0, n_bins))
+        return cls(feature_stats, probability_stats)
+
+    def update(self, feature_values, probability):
+        # Les endpoints synchrones de FastAPI s'exécutent dans un pool de threads
+        with self._lock:
+            self.requests += 1
+            for feature, stats in self.feature_stats.items():
+                stats.update(feature_values.get(feature))
+            self.probability_stats.update(probability)
+
+    def report(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "features": {feature: stats.to_dict() for feature, stats in self.feature_stats.items()},
+                "probability_of_default": self.probability_stats.to_dict(),
+            }
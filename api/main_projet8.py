@@ -14,14 +14,21 @@ Sections principales:
 # Import des bibliothèques et initialisation de l'API
 #--------------------------------------------------------------------------------------------------
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
 import pickle
 import os
-import shap 
+import threading
+from api.drift_monitor import DriftMonitor
+from api.description_index import DescriptionIndex
+from api.result_cache import ResultCache, feature_vector_key, file_fingerprint
 
-app = FastAPI()
+# shap (et numba) n'est importé qu'à la première demande d'explication ou au warm-up: voir get_explainer()
 
 # Définir les chemins relatifs à partir du dossier "api"
 base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Revenir au dossier "backend"
@@ -29,29 +36,187 @@ base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Reveni
 
 
 
+###############################################################################################################
+# CHARGEMENT TYPÉ DES DONNÉES CLIENTS
+
+# pd.read_csv charge toutes les colonnes numériques en float64 (ou en object si les types sont mélangés),
+# alors qu'une grande partie des colonnes sont des indicateurs, des comptages ou des petites catégories.
+# On infère donc un schéma par colonne pour conserver les données clients sous forme compacte,
+# et on ne reconvertit en float64 (type attendu par le modèle) qu'au moment du scoring.
+
+# Nombre maximal de modalités pour qu'une colonne texte soit stockée en catégorie
+MAX_CATEGORIES = 255
+
+# Au-delà de cette proportion de valeurs manquantes, une colonne décimale est stockée en format creux (sparse):
+# seules les valeurs présentes et leurs positions sont conservées
+SPARSE_MIN_MISSING_RATIO = 0.7
+
+# Types entiers candidats, du plus compact au plus large
+INTEGER_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def infer_column_dtype(values):
+    # Colonne texte ou mélangée: codes catégoriels si peu de modalités, sinon on garde object
+    if values.dtype == object:
+        if values.nunique(dropna=True) <= MAX_CATEGORIES:
+            return "category"
+        return "object"
+
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return str(values.dtype)
+
+    finite_values = values.replace([np.inf, -np.inf], np.nan).dropna()
+    is_integral = finite_values.empty or bool((finite_values == np.round(finite_values)).all())
+
+    # Indicateurs et comptages sans valeur manquante ni infinie: plus petit type entier suffisant
+    if is_integral and bool(np.isfinite(values).all()) and not finite_values.empty:
+        for dtype in INTEGER_DTYPES:
+            info = np.iinfo(dtype)
+            if finite_values.min() >= info.min and finite_values.max() <= info.max:
+                return np.dtype(dtype).name
+
+    # Autres colonnes numériques: float32 seulement si la conversion est sans perte (NaN et infinis compris),
+    # pour que les valeurs servies et les prédictions restent identiques aux données d'origine; sinon float64
+    as_float64 = values.to_numpy(dtype=np.float64)
+    float_dtype = "float64"
+    if np.array_equal(as_float64.astype(np.float32).astype(np.float64), as_float64, equal_nan=True):
+        float_dtype = "float32"
+    if len(values) and values.isna().mean() >= SPARSE_MIN_MISSING_RATIO:
+        return f"Sparse[{float_dtype}, nan]"
+    return float_dtype
+
+
+def load_client_data(path, keep_columns=("SK_ID_CURR",)):
+    raw_df = pd.read_csv(path)
+    raw_memory = int(raw_df.memory_usage(deep=True).sum())
+
+    # Schéma par colonne; les identifiants sont conservés tels quels
+    schema = {}
+    for column in raw_df.columns:
+        if column in keep_columns:
+            schema[column] = str(raw_df[column].dtype)
+        else:
+            schema[column] = infer_column_dtype(raw_df[column])
+
+    compact_df = raw_df.astype(schema)
+    compact_memory = int(compact_df.memory_usage(deep=True).sum())
+
+    memory_report = {
+        "raw_bytes": raw_memory,
+        "compact_bytes": compact_memory,
+        "ratio": round(compact_memory / raw_memory, 4) if raw_memory else None,
+    }
+    return compact_df, schema, memory_report
+
+
+def to_model_input(features):
+    # Reconversion vers les types attendus par le modèle: float64 dense pour les colonnes numériques
+    # (y compris creuses), valeurs d'origine pour les colonnes catégorielles
+    model_input = features.copy()
+    categorical_columns = model_input.select_dtypes(include="category").columns
+    numeric_columns = model_input.columns.difference(categorical_columns, sort=False)
+    if len(categorical_columns):
+        model_input[categorical_columns] = model_input[categorical_columns].astype(object)
+    model_input[numeric_columns] = model_input[numeric_columns].astype(np.float64)
+    return model_input
+
+
+
+
 ###############################################################################################################
 # CHARGEMENT DES MODELES ET DONNEES
 
-# Charger le modèle de machine learning
-model_path = os.path.join(base_path, "model", "lightgbm_classifier_model", "model.pkl")
-with open(model_path, "rb") as f:
-    model = pickle.load(f)
+# Le modèle, les CSV et l'explainer SHAP ne sont plus chargés à l'import du module: le chargement est lancé
+# en arrière-plan par le hook lifespan de FastAPI, pour que l'API réponde à "/" dès le démarrage de l'instance
+# (démarrages à froid App Engine). Les endpoints qui en ont besoin attendent la fin du chargement.
 
-# Charger les données clients en CSV
+model_path = os.path.join(base_path, "model", "lightgbm_classifier_model", "model.pkl")
 data_path = os.path.join(base_path, "data", "sample_client_api.csv")
-df = pd.read_csv(data_path)
-
-# Charger les features importances en CSV
 feature_importance_path = os.path.join(base_path, "data", "feature_importance.csv")
-feature_importance_df = pd.read_csv(feature_importance_path)
-
-# Charger le fichier contenant les descriptions des colonnes en CSV
 file_path = os.path.join(base_path,'data', 'HomeCredit_columns_description.csv')
-df_columns_description = pd.read_csv(file_path, encoding='ISO-8859-1')
 
 # Utiliser le seuil pour la décision de prêt
 THRESHOLD = 0.36
 
+# Ressources partagées, remplies par load_resources() et get_explainer()
+resources = {}
+resources_lock = threading.Lock()
+explainer_lock = threading.Lock()
+
+
+def load_resources():
+    # Chargement idempotent: le premier appel charge tout, les suivants attendent puis retournent les ressources.
+    # Une fois le chargement terminé, aucun verrou n'est pris (double vérification)
+    if "model" in resources:
+        return resources
+    with resources_lock:
+        if "model" in resources:
+            return resources
+
+        # Charger le modèle de machine learning
+        with open(model_path, "rb") as f:
+            model = pickle.load(f)
+
+        # Charger les données clients en CSV, sous forme compacte (schéma et empreinte mémoire conservés)
+        df, client_schema, client_memory_report = load_client_data(data_path)
+
+        # Charger les features importances en CSV
+        feature_importance_df = pd.read_csv(feature_importance_path)
+
+        # Charger le fichier contenant les descriptions des colonnes en CSV
+        df_columns_description = pd.read_csv(file_path, encoding='ISO-8859-1')
+
+        # Moniteur de dérive: la population de référence est l'échantillon client chargé et ses probabilités prédites
+        reference_probabilities = model.predict_proba(to_model_input(df.drop(columns=["SK_ID_CURR", "TARGET"])))[:, 1]
+        drift_monitor = DriftMonitor.from_reference(df, feature_importance_df['Feature'].head(10).tolist(), reference_probabilities)
+
+        resources.update({
+            "df": df,
+            "client_schema": client_schema,
+            "client_memory_report": client_memory_report,
+            "feature_importance_df": feature_importance_df,
+            "df_columns_description": df_columns_description,
+            "description_index": DescriptionIndex.from_dataframe(df_columns_description),
+            # Cache des résultats de scoring, invalidé par la version (empreinte) du modèle
+            "model_version": file_fingerprint(model_path),
+            "result_cache": ResultCache.from_environment(),
+            "drift_monitor": drift_monitor,
+        })
+        # Le modèle est enregistré en dernier: sa présence signale que toutes les données sont prêtes
+        resources["model"] = model
+        # Une erreur d'un chargement précédent n'est plus d'actualité
+        resources.pop("error", None)
+        return resources
+
+
+def get_explainer():
+    # Import différé de shap et création unique de l'explainer (auparavant recréé à chaque requête)
+    loaded = load_resources()
+    with explainer_lock:
+        if "explainer" not in resources:
+            import shap
+            resources["explainer"] = shap.TreeExplainer(loaded["model"].named_steps['lgbm'])
+            resources.pop("error", None)
+        return resources["explainer"]
+
+
+def warm_up():
+    # Chargement complet en arrière-plan (données puis explainer)
+    try:
+        load_resources()
+        get_explainer()
+    except Exception as e:
+        resources["error"] = str(e)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    threading.Thread(target=warm_up, daemon=True).start()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
 
 
 ###############################################################################################################
@@ -59,7 +224,173 @@ THRESHOLD = 0.36
 
 # Fonction utilitaire pour obtenir le top 10 des features
 def get_top_10_features():
-    return feature_importance_df['Feature'].head(10).tolist()
+    return load_resources()["feature_importance_df"]['Feature'].head(10).tolist()
+
+
+# Champs de réponse disponibles pour les endpoints client (paramètre "fields")
+CLIENT_FIELDS = ("probability_of_default", "decision", "shap_values", "client_feature_values")
+
+# Nombre maximal de clients par requête batch
+MAX_BATCH_SIZE = 100
+
+
+def parse_fields(fields):
+    # "fields" est une liste séparée par des virgules; par défaut tous les champs sont renvoyés
+    if fields is None:
+        return set(CLIENT_FIELDS)
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(CLIENT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def explain(features):
+    # Valeurs SHAP de la classe positive (défaut), une ligne par client, et valeur de base associée
+    explainer = get_explainer()
+    shap_values = explainer.shap_values(features)
+    expected_value = explainer.expected_value
+    # Avec shap 0.45.1 et ce modèle, shap_values est déjà un tableau (n, n_features) de la classe positive
+    # (log-odds); une liste [classe 0, classe 1] n'est gérée que par précaution pour d'autres versions de shap
+    if isinstance(shap_values, list):
+        shap_values = shap_values[1]
+        expected_value = expected_value[1]
+    return float(np.ravel(expected_value)[-1]), np.asarray(shap_values)
+
+
+def top_k_indices(values, top_k):
+    # Indices des k plus fortes contributions en valeur absolue, triés par importance décroissante;
+    # argpartition sélectionne les k plus grandes en O(n) avant de ne trier que ces k valeurs
+    magnitudes = np.abs(values)
+    if top_k < len(magnitudes):
+        candidates = np.argpartition(-magnitudes, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(len(magnitudes))
+    return candidates[np.argsort(-magnitudes[candidates], kind="stable")]
+
+
+def json_value(value):
+    # Remplacer NaN et valeurs infinies par None (compatible avec JSON)
+    if isinstance(value, (float, np.floating)) and not np.isfinite(value):
+        return None
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def compute_results(features, with_shap=True):
+    # Probabilités et valeurs SHAP, servies par le cache de résultats quand le même vecteur a déjà été scoré.
+    # Sans SHAP (ex: décision seule), les lignes absentes du cache sont seulement prédites, sans mise en cache
+    loaded = load_resources()
+    result_cache = loaded["result_cache"]
+    keys = [feature_vector_key(loaded["model_version"], values) for values in features.to_numpy()]
+    cached = [result_cache.get(key) for key in keys]
+
+    # Un seul appel au modèle et à SHAP pour toutes les lignes absentes du cache
+    missing = [row for row, value in enumerate(cached) if value is None]
+    if missing and not with_shap:
+        probabilities = loaded["model"].predict_proba(features.iloc[missing])[:, 1]
+        for position, row in enumerate(missing):
+            cached[row] = (float(probabilities[position]), None, None)
+    elif missing:
+        missing_features = features.iloc[missing]
+        probabilities = loaded["model"].predict_proba(missing_features)[:, 1]
+        base_value, shap_matrix = explain(missing_features)
+        for position, row in enumerate(missing):
+            result_cache.put(keys[row], probabilities[position], base_value, shap_matrix[position])
+            cached[row] = (float(probabilities[position]), base_value, shap_matrix[position])
+    return cached
+
+
+def score_features(client_ids, features, top_k=None, fields=None, monitor=False):
+    # Prédiction, valeurs SHAP et valeurs des features pour une ou plusieurs lignes déjà au format du modèle
+    loaded = load_resources()
+    fields = parse_fields(fields)
+
+    feature_names = np.array(features.columns)
+    feature_values = features.to_numpy(dtype=object)
+    computed = compute_results(features, with_shap="shap_values" in fields or top_k is not None)
+
+    monitored_positions = [features.columns.get_loc(feature) for feature in get_top_10_features()]
+
+    results = []
+    for row, client_id in enumerate(client_ids):
+        probability, base_value, shap_row = computed[row]
+        result = {"client_id": client_id}
+
+        if "probability_of_default" in fields:
+            result["probability_of_default"] = probability
+        if "decision" in fields:
+            result["decision"] = "Crédit accordé" if probability < THRESHOLD else "Crédit non accordé"
+
+        # Top k des contributions ou vecteur complet
+        positions = top_k_indices(shap_row, top_k) if top_k is not None else np.arange(len(feature_names))
+
+        if "shap_values" in fields:
+            # Créer un dictionnaire des valeurs SHAP associées aux noms des features
+            result["shap_values"] = {
+                "features": feature_names[positions].tolist(),
+                "shap_values": shap_row[positions].tolist(),
+                "base_value": base_value,
+            }
+        if "client_feature_values" in fields:
+            # Créer un dictionnaire des valeurs des features du client (mêmes features que les valeurs SHAP)
+            result["client_feature_values"] = {
+                feature_names[position]: json_value(feature_values[row, position]) for position in positions
+            }
+
+        # Mettre à jour les statistiques de dérive (O(1) par requête, sans historique), uniquement pour un scoring
+        # explicitement signalé: les simples consultations (rafraîchissements du tableau de bord) ne sont pas comptées
+        if monitor:
+            monitored_values = {feature_names[position]: json_value(feature_values[row, position]) for position in monitored_positions}
+            loaded["drift_monitor"].update(monitored_values, probability)
+
+        results.append(result)
+    return results
+
+
+def summarize_feature_data(df, features, bins, sample_size):
+    # Données pré-agrégées pour les graphiques du tableau de bord: histogrammes par feature (tous les clients,
+    # TARGET=0, TARGET=1) et échantillon de taille bornée pour les nuages de points
+    target = df["TARGET"].to_numpy(dtype=np.float64)
+    histograms = {}
+    for feature in features:
+        values = df[feature].to_numpy(dtype=np.float64)
+        finite = np.isfinite(values)
+        if not finite.any():
+            histograms[feature] = {"bin_edges": [], "all": [], "target_0": [], "target_1": []}
+            continue
+        bin_edges = np.histogram_bin_edges(values[finite], bins=bins)
+        histograms[feature] = {
+            "bin_edges": bin_edges.tolist(),
+            "all": np.histogram(values[finite], bins=bin_edges)[0].tolist(),
+            "target_0": np.histogram(values[finite & (target == 0)], bins=bin_edges)[0].tolist(),
+            "target_1": np.histogram(values[finite & (target == 1)], bins=bin_edges)[0].tolist(),
+        }
+
+    # Échantillon aléatoire reproductible, identique pour toutes les features
+    rng = np.random.default_rng(0)
+    sample_rows = np.sort(rng.choice(len(df), size=min(sample_size, len(df)), replace=False))
+    sample = {
+        "target": [json_value(value) for value in target[sample_rows]],
+        "values": {
+            feature: [json_value(value) for value in df[feature].to_numpy(dtype=np.float64)[sample_rows]]
+            for feature in features
+        },
+    }
+
+    return {
+        "top_10_features": features,
+        "n_clients": len(df),
+        "histograms": histograms,
+        "sample": sample,
+    }
+
+
+def score_clients(client_data, top_k=None, fields=None, monitor=False):
+    # Préparation des données pour la prédiction (reconversion en float64 uniquement pour le scoring)
+    features = to_model_input(client_data.drop(columns=["SK_ID_CURR", "TARGET"]))
+    return score_features(client_data["SK_ID_CURR"].tolist(), features, top_k=top_k, fields=fields, monitor=monitor)
 
 
 
@@ -70,50 +401,86 @@ def get_top_10_features():
 #------------------------------------------------------------------------------------------------
 # ENDPOINT: récupère données clients, calcule la probabilité de défaut, calcule les valeurs SHAP
 
+# Paramètres optionnels:
+# - top_k: ne renvoyer que les k plus fortes contributions SHAP (en valeur absolue) et les valeurs des features associées
+# - fields: liste des champs à renvoyer, séparés par des virgules (ex: "probability_of_default,decision")
+# - monitor: compter ce scoring dans le suivi de dérive (/monitoring/drift); à n'activer qu'une fois par décision
 @app.get("/client/{client_id}")
-def get_client_info(client_id: int):
+def get_client_info(client_id: int, top_k: Optional[int] = Query(None, ge=1), fields: Optional[str] = None, monitor: bool = False):
+    df = load_resources()["df"]
+
     # Rechercher les données du client par son ID
     client_data = df[df["SK_ID_CURR"] == client_id]
     if client_data.empty:
         raise HTTPException(status_code=404, detail="Client not found")
 
-    # Préparation des données pour la prédiction
-    features = client_data.drop(columns=["SK_ID_CURR", "TARGET"])
-    
-    # Faire une prédiction avec le modèle chargé
-    probability = model.predict_proba(features)[:, 1][0]
-    decision = "Crédit accordé" if probability < THRESHOLD else "Crédit non accordé"
+    return score_clients(client_data, top_k=top_k, fields=fields, monitor=monitor)[0]
 
-    # Extraire le modèle LightGBM depuis le pipeline
-    lgbm_model = model.named_steps['lgbm']
 
-    # Utiliser SHAP pour calculer les valeurs locales des features
-    explainer = shap.TreeExplainer(lgbm_model)
-    shap_values = explainer.shap_values(features)
-    
-    # Créer un dictionnaire des valeurs SHAP associées aux noms des features
-    shap_dict = {
-        "features": list(features.columns),
-        "shap_values": shap_values[0].tolist()  # shap_values[0] pour la classe positive car dans les classifications binaires, shap ne renvoie qu'une série de valeurs
-    }
 
-    # Créer un dictionnaire des valeurs des features du client
-    client_feature_values = features.iloc[0].replace([np.inf, -np.inf], np.nan).to_dict()  # Récupère les valeurs des features du client
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: équivalent batch de /client/{client_id} pour plusieurs clients
+
+class ClientBatchRequest(BaseModel):
+    client_ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    top_k: Optional[int] = Field(None, ge=1)
+    fields: Optional[str] = None
+    monitor: bool = False
 
-    # Remplacer les NaN par None (compatible avec JSON)
-    client_feature_values = {k: (None if pd.isna(v) else v) for k, v in client_feature_values.items()}
 
+@app.post("/clients")
+def get_clients_info(batch: ClientBatchRequest):
+    df = load_resources()["df"]
+
+    # Rechercher les données des clients, dans l'ordre de la requête et sans doublons
+    client_ids = list(dict.fromkeys(batch.client_ids))
+    client_data = df[df["SK_ID_CURR"].isin(client_ids)].drop_duplicates(subset="SK_ID_CURR")
+    found_ids = set(client_data["SK_ID_CURR"].tolist())
+    client_data = client_data.set_index("SK_ID_CURR", drop=False).loc[[client_id for client_id in client_ids if client_id in found_ids]].reset_index(drop=True)
+
+    clients = score_clients(client_data, top_k=batch.top_k, fields=batch.fields, monitor=batch.monitor) if found_ids else []
     return {
-        "client_id": client_id,
-        "probability_of_default": probability,
-        "decision": decision,
-        "shap_values": shap_dict,
-        "client_feature_values": client_feature_values
+        "clients": clients,
+        "not_found": [client_id for client_id in client_ids if client_id not in found_ids]
     }
 
 
 
 
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: scoring en direct d'un client inconnu ou de valeurs de features modifiées
+
+# Les valeurs de "features" remplacent celles du client (client_id connu) ou complètent un vecteur de
+# valeurs manquantes (client inconnu ou absent); les résultats sont mis en cache par vecteur de features.
+# Ces vecteurs modifiés ou synthétiques ne sont jamais comptés dans le suivi de dérive
+class ScoreRequest(BaseModel):
+    client_id: Optional[int] = None
+    features: Dict[str, Optional[float]] = Field(default_factory=dict)
+    top_k: Optional[int] = Field(None, ge=1)
+    fields: Optional[str] = None
+
+
+@app.post("/score")
+def score_client_features(score_request: ScoreRequest):
+    df = load_resources()["df"]
+
+    client_data = df[df["SK_ID_CURR"] == score_request.client_id] if score_request.client_id is not None else df.iloc[:0]
+    if client_data.empty:
+        # Client inconnu: toutes les features sont manquantes sauf celles fournies
+        features = to_model_input(df.drop(columns=["SK_ID_CURR", "TARGET"]).iloc[:0]).reindex([0])
+    else:
+        features = to_model_input(client_data.drop(columns=["SK_ID_CURR", "TARGET"]).iloc[:1]).reset_index(drop=True)
+
+    unknown = set(score_request.features) - set(features.columns)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown features: {', '.join(sorted(unknown))}")
+    for feature, value in score_request.features.items():
+        features.loc[0, feature] = np.nan if value is None else value
+
+    return score_features([score_request.client_id], features, top_k=score_request.top_k, fields=score_request.fields)[0]
+
+
+
 #------------------------------------------------------------------------------------------------
 # ENDPOINT: récupère la liste du top 10 des features importances
 
@@ -122,7 +489,7 @@ def get_client_info(client_id: int):
 def get_feature_importance():
     try:
         # Retourner les 10 features les plus importantes
-        top_10_features = feature_importance_df.head(10).to_dict(orient="records")
+        top_10_features = load_resources()["feature_importance_df"].head(10).to_dict(orient="records")
         return {"top_10_feature_importance": top_10_features}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -140,6 +507,7 @@ def get_feature_data():
         top_10_features = get_top_10_features()
 
         # Extraire les valeurs des features pour tout le dataset
+        df = load_resources()["df"]
         feature_data = {}
 
         # Remplacer les valeurs infinies et NaN par None, compatible avec JSON
@@ -161,6 +529,31 @@ def get_feature_data():
 
 
 
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: données pré-agrégées du top 10 des features (histogrammes et échantillon) pour visualisation
+
+# La taille de la réponse ne dépend que de "bins" et "sample_size", pas du nombre de clients.
+# Seuls les paramètres par défaut (ceux du tableau de bord) sont mis en cache: les autres sont recalculés,
+# pour que les appelants ne puissent pas faire grossir la mémoire du serveur
+FEATURE_SUMMARY_BINS = 30
+FEATURE_SUMMARY_SAMPLE_SIZE = 2000
+
+@app.get("/feature-summary")
+def get_feature_summary(bins: int = Query(FEATURE_SUMMARY_BINS, ge=1, le=200),
+                        sample_size: int = Query(FEATURE_SUMMARY_SAMPLE_SIZE, ge=1, le=20000)):
+    loaded = load_resources()
+    top_10_features = get_top_10_features()
+    if (bins, sample_size) != (FEATURE_SUMMARY_BINS, FEATURE_SUMMARY_SAMPLE_SIZE):
+        return summarize_feature_data(loaded["df"], top_10_features, bins, sample_size)
+
+    # Calcul hors verrou pour ne pas bloquer les autres endpoints; un calcul concurrent éventuel est simplement écarté
+    if "feature_summary" not in resources:
+        summary = summarize_feature_data(loaded["df"], top_10_features, bins, sample_size)
+        resources.setdefault("feature_summary", summary)
+    return resources["feature_summary"]
+
+
+
 #------------------------------------------------------------------------------------------------
 # ENDPOINT: récupère les descriptions des features pour visualisation
 
@@ -169,7 +562,7 @@ def get_feature_data():
 def get_column_description():
     try:
         # Extraire les colonnes "Row" et "Description"
-        columns_data = df_columns_description[['Row', 'Description']].dropna().to_dict(orient='records')
+        columns_data = load_resources()["df_columns_description"][['Row', 'Description']].dropna().to_dict(orient='records')
         return {"columns_description": columns_data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -177,7 +570,89 @@ def get_column_description():
 
 
 #------------------------------------------------------------------------------------------------
-# ENDPOINT: vérifier que l'API fonctionne
+# ENDPOINT: recherche dans les descriptions des features (index inversé sur Row, Table et Description)
+
+# Déclaré avant /column-description/{row} pour que "search" ne soit pas interprété comme un nom de variable
+@app.get("/column-description/search")
+def search_column_description(q: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=100)):
+    results = load_resources()["description_index"].search(q, limit=limit)
+    return {"query": q, "results": results}
+
+
+
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: description d'une feature (toutes les tables où elle apparaît)
+
+@app.get("/column-description/{row}")
+def get_column_description_by_row(row: str):
+    entries = load_resources()["description_index"].lookup(row)
+    if not entries:
+        raise HTTPException(status_code=404, detail="Column not found")
+    return {"row": entries[0]["Row"], "descriptions": entries}
+
+
+
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: schéma des données clients et empreinte mémoire
+
+@app.get("/data-schema")
+def get_data_schema():
+    loaded = load_resources()
+    return {
+        "schema": loaded["client_schema"],
+        "memory_usage": loaded["client_memory_report"]
+    }
+
+
+
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: suivi de la dérive de la population scorée par rapport à la population de référence
+
+@app.get("/monitoring/drift")
+def get_drift_monitoring():
+    return load_resources()["drift_monitor"].report()
+
+
+
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: efficacité du cache de résultats (hits mémoire / disque, taille)
+
+@app.get("/monitoring/cache")
+def get_cache_monitoring():
+    return load_resources()["result_cache"].report()
+
+
+
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: warm-up App Engine (inbound_services: warmup), charge les données et l'explainer SHAP
+
+@app.get("/_ah/warmup")
+def warmup():
+    get_explainer()
+    return {"message": "API is warm!"}
+
+
+
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: vérifier que l'API est prête (modèle, données et explainer chargés)
+
+@app.get("/ready")
+def read_ready():
+    status = {
+        "model": "model" in resources,
+        "data": "df" in resources,
+        "explainer": "explainer" in resources,
+    }
+    ready = all(status.values())
+    content = {"ready": ready, **status}
+    if "error" in resources:
+        content["error"] = resources["error"]
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+
+
+#------------------------------------------------------------------------------------------------
+# ENDPOINT: vérifier que l'API fonctionne (liveness: ne dépend d'aucun chargement)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,199 @@
+##################################################################################################
+### CACHE DES RÉSULTATS DE SCORING
+##################################################################################################
+
+"""
+Cache adressé par contenu des résultats de scoring (probabilité, valeurs SHAP, valeur de base):
+- clé = empreinte SHA-256 de la version du modèle et du vecteur de features envoyé au modèle
+- LRU borné en mémoire, devant une base SQLite locale partagée par les workers d'une même machine
+- éviction par taille sur disque (entrées les moins récemment utilisées en premier)
+- compteurs de hits mémoire / disque et de misses pour suivre l'efficacité du cache
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Valeurs par défaut, modifiables par variables d'environnement
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "credit_scoring_results.sqlite")
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_MAX_DISK_BYTES = 64 * 1024 * 1024
+
+# Fréquence (en écritures) de la vérification de la taille sur disque
+EVICTION_CHECK_INTERVAL = 100
+
+# Après éviction, la base est ramenée à cette fraction de sa taille maximale
+EVICTION_TARGET_RATIO = 0.9
+
+# Les accès servis par le LRU mémoire sont reportés sur disque par lots (last_access), pour que les entrées
+# les plus utilisées ne soient pas évincées en premier, sans écrire en base à chaque hit
+TOUCH_FLUSH_SIZE = 100
+TOUCH_FLUSH_INTERVAL = 30
+
+
+###############################################################################################################
+# CLÉS DU CACHE
+
+def file_fingerprint(path):
+    # Version du modèle: empreinte du fichier pickle, pour invalider le cache à chaque nouveau modèle
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def feature_vector_key(model_version, values):
+    # Empreinte du vecteur de features tel qu'envoyé au modèle (float64 dans l'ordre des colonnes)
+    try:
+        payload = np.ascontiguousarray(values, dtype=np.float64).tobytes()
+    except (TypeError, ValueError):
+        payload = repr(list(values)).encode()
+    return hashlib.sha256(model_version.encode() + b"\0" + payload).hexdigest()
+
+
+###############################################################################################################
+# CACHE LRU MÉMOIRE + SQLITE
+
+class ResultCache:
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=DEFAULT_MEMORY_ENTRIES, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()  # clé -> (probabilité, valeur de base, valeurs SHAP)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._touched = {}  # clé -> dernier accès mémoire pas encore reporté sur disque
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Une seule connexion protégée par un verrou; SQLite gère les accès concurrents entre processus
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, probability REAL NOT NULL, base_value REAL, shap BLOB NOT NULL, "
+            "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+
+    @classmethod
+    def from_environment(cls):
+        return cls(
+            path=os.environ.get("RESULT_CACHE_PATH", DEFAULT_CACHE_PATH),
+            memory_entries=int(os.environ.get("RESULT_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES)),
+            max_disk_bytes=int(os.environ.get("RESULT_CACHE_MAX_BYTES", DEFAULT_MAX_DISK_BYTES)),
+        )
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self._touch(key)
+                return self.memory[key]
+
+            row = self._connection.execute(
+                "SELECT probability, base_value, shap FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            self._connection.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+            value = (row[0], row[1], np.frombuffer(row[2], dtype=np.float64))
+            self._remember(key, value)
+            self.stats["disk_hits"] += 1
+            return value
+
+    def put(self, key, probability, base_value, shap_values):
+        shap_blob = np.ascontiguousarray(shap_values, dtype=np.float64).tobytes()
+        value = (float(probability), base_value, np.frombuffer(shap_blob, dtype=np.float64))
+        with self._lock:
+            self._remember(key, value)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, probability, base_value, shap, size, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value[0], base_value, shap_blob, len(key) + len(shap_blob) + 16, time.time()),
+            )
+            self.stats["writes"] += 1
+            if self.stats["writes"] % EVICTION_CHECK_INTERVAL == 0:
+                self._evict()
+
+    def _touch(self, key):
+        now = time.time()
+        self._touched[key] = now
+        if len(self._touched) >= TOUCH_FLUSH_SIZE or now - self._last_flush >= TOUCH_FLUSH_INTERVAL:
+            self._flush_touches()
+
+    def _flush_touches(self):
+        # MAX: une écriture (put) plus récente que l'accès mémoire garde sa date
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE results SET last_access = MAX(last_access, ?) WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+        self._last_flush = time.time()
+
+    def flush(self):
+        with self._lock:
+            self._flush_touches()
+
+    def _evict(self):
+        # Supprimer les entrées les moins récemment utilisées jusqu'à repasser sous la taille cible
+        self._flush_touches()
+        total_size = self._disk_size()
+        if total_size <= self.max_disk_bytes:
+            return
+        to_free = total_size - int(self.max_disk_bytes * EVICTION_TARGET_RATIO)
+        freed = 0
+        keys = []
+        for key, size in self._connection.execute("SELECT key, size FROM results ORDER BY last_access"):
+            if freed >= to_free:
+                break
+            keys.append(key)
+            freed += size
+        self._connection.executemany("DELETE FROM results WHERE key = ?", [(key,) for key in keys])
+        for key in keys:
+            self.memory.pop(key, None)
+        self.stats["evictions"] += len(keys)
+
+    def evict(self):
+        with self._lock:
+            self._evict()
+
+    def _disk_size(self):
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def report(self):
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "lookups": lookups,
+                "hit_ratio": hits / lookups if lookups else None,
+                "memory_hit_ratio": self.stats["memory_hits"] / lookups if lookups else None,
+                "disk_hit_ratio": self.stats["disk_hits"] / lookups if lookups else None,
+                "memory_entries": len(self.memory),
+                "memory_max_entries": self.memory_entries,
+                "disk_entries": self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0],
+                "disk_bytes": self._disk_size(),
+                "disk_max_bytes": self.max_disk_bytes,
+            }
@@ -26,11 +26,8 @@ import requests
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-import shap
-import tempfile
-import base64
-import math
 import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 # # Adresse de l'API
 # api_url = "http://127.0.0.1:8000"
@@ -41,6 +38,98 @@ api_url = "https://projet8-credit-risk.ew.r.appspot.com"
 # Threshold pour la décision
 THRESHOLD = 0.36
 
+# Budget de temps par requête: au-delà, la section concernée affiche une erreur au lieu de bloquer la page
+REQUEST_TIMEOUT = 10
+
+# Budget de temps d'attente d'une section (file d'attente du pool de threads comprise)
+SECTION_TIMEOUT = REQUEST_TIMEOUT
+
+# Nombre de contributions SHAP affichées pour le client
+TOP_K_SHAP = 15
+
+# Données pré-agrégées demandées à l'API: la taille ne dépend pas du nombre de clients
+HIST_BINS = 30
+SCATTER_SAMPLE_SIZE = 2000
+
+# Durée de conservation des données globales (features importances, histogrammes) côté interface
+CACHE_TTL = 600
+
+#-------------------------------------------------------------------------------------------------
+# Récupération des données de l'API
+
+# Les requêtes propres au client sont lancées en parallèle dans des threads (sans appel à Streamlit),
+# les données globales sont mises en cache: chaque section s'affiche dès que ses données sont disponibles.
+
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def fetch_json(path, params=None):
+    # Retourne le JSON de la réponse, ou None en cas d'erreur ou de dépassement du budget de temps
+    try:
+        response = requests.get(f"{api_url}{path}", params=params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException:
+        return None
+    return response.json() if response.status_code == 200 else None
+
+
+def fetch_async(path, params=None):
+    return get_executor().submit(fetch_json, path, params)
+
+
+def wait_result(future):
+    # Résultat d'une requête lancée en parallèle, ou None si le budget de la section est dépassé
+    try:
+        return future.result(timeout=SECTION_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        return None
+
+
+class ApiError(Exception):
+    pass
+
+
+def fetch_json_or_raise(path, params=None):
+    # Pour les fonctions en cache: une exception n'est pas mise en cache, contrairement à None
+    data = fetch_json(path, params)
+    if data is None:
+        raise ApiError(path)
+    return data
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_feature_importance():
+    return fetch_json_or_raise("/feature-importance")
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_feature_summary():
+    return fetch_json_or_raise("/feature-summary", {"bins": HIST_BINS, "sample_size": SCATTER_SAMPLE_SIZE})
+
+
+def get_feature_importance():
+    # None en cas d'erreur: la section affiche l'erreur et la requête est retentée à la prochaine exécution
+    try:
+        return load_feature_importance()
+    except ApiError:
+        return None
+
+
+def get_feature_summary():
+    try:
+        return load_feature_summary()
+    except ApiError:
+        return None
+
+
+def fetch_client_values(client_id):
+    # Valeurs des features du client uniquement (ni probabilité ni valeurs SHAP)
+    if not client_id:
+        return None
+    return fetch_async(f"/client/{client_id}", {"fields": "client_feature_values"})
+
 #-------------------------------------------------------------------------------------------------
 # Création des onglets
 
@@ -92,153 +181,116 @@ if selection == "Accueil":
 # Description: Visualisation de :
 # - la décision d'octroi de crédit sous forme de compteur avec indication de la valeur seuil de décision.
 # - la feature importance locale (valeurs shap)
+# La décision et le compteur s'affichent dès leur réception; les contributions SHAP sont demandées en parallèle
+# et complètent la page à leur arrivée.
 
 if selection == "Le client: décision d'octroi de crédit":
     st.header("Décision d'octroi de crédit du client")
 
-    client_id = st.text_input("Entrez l'ID du Client")
-
-    # Initialiser les variables pour éviter l'erreur si le bouton n'est pas cliqué
-    data = None
-    probability = None
-    decision = None
-    shap_values = None
-    features = None
-    client_values = {}  # Initialisation pour éviter les erreurs
-    top_10_features = []  # Initialisation pour récupérer le top 10 des features
-
-
-    ##################################################################################################
-    # Récupérer le top 10 des features via l'API
-    feature_importance_endpoint = f"{api_url}/feature-importance"
-    feature_response = requests.get(feature_importance_endpoint)
-
-    if feature_response.status_code == 200:
-        # Récupérer les 10 features les plus importantes
-        feature_data = feature_response.json()
-        top_10_features = [feature["Feature"] for feature in feature_data["top_10_feature_importance"]]
-
+    client_id = st.text_input("Entrez l'ID du Client", value=st.session_state.get('client_id', ""))
 
     #--------------------------------------------------------------------------------------------------
     # Bouton d'obtention des informations du client
-    if st.button("Obtenir les Informations du Client"):
+    # Seul le clic sur le bouton est un nouveau scoring, compté dans le suivi de dérive de l'API (monitor);
+    # les réexécutions de la page ne sont que des consultations
+    new_scoring = st.button("Obtenir les Informations du Client")
+    if new_scoring:
         st.session_state['client_id'] = client_id  # Stocker client_id dans session_state
-        # Construire l'URL de l'API pour ce client
-        endpoint = f"{api_url}/client/{client_id}"
-        
-        # Envoyer une requête GET à l'API
-        response = requests.get(endpoint)
-
-        if response.status_code == 200:
-            # Récupérer les données JSON renvoyées par l'API
-            data = response.json()
+
+    client_id = st.session_state.get('client_id')
+    if client_id:
+        # Lancer en parallèle la requête de décision (légère) et celle des principales contributions SHAP
+        decision_params = {"fields": "probability_of_default,decision", "monitor": "true" if new_scoring else "false"}
+        decision_future = fetch_async(f"/client/{client_id}", decision_params)
+        shap_future = fetch_async(f"/client/{client_id}", {"top_k": TOP_K_SHAP, "fields": "shap_values"})
+
+        data = wait_result(decision_future)
+        if data is None:
+            st.error("Erreur lors de la récupération des informations du client.")
+        else:
             probability = data['probability_of_default']
             decision = data["decision"]
-            
-            # Récupérer les valeurs SHAP
-            shap_endpoint = f"{api_url}/client/{client_id}"
-            shap_response = requests.get(shap_endpoint)
-            
-            if shap_response.status_code == 200:
-                shap_data = shap_response.json()
-                shap_values = np.array(shap_data["shap_values"]["shap_values"])
-                features = shap_data["shap_values"]["features"]
-                
-                # Récupérer les valeurs du client uniquement pour les 10 features importantes
-                client_values = {k: v for k, v in shap_data.get("client_feature_values", {}).items() if k in top_10_features}
-            else:
-                shap_values = None
-                features = None
-                client_values = {}
-        else:
-            st.error("Erreur lors de la récupération des informations du client.")
-            data = None
-            probability = None
-            decision = None
-            shap_values = None
-            features = None
-            client_values = {}
-
-
-
-    # -------------------------------------------------------------------------------------
-    # Affichage de la décision d'octroi de crédit après avoir cliqué sur le bouton
-
-    if data:
-        decision_color = "#008BFB" if decision == "Crédit accordé" else "#FF005E"
-        st.markdown(f"""
-            <div style='display: inline-block; padding: 10px 20px; border: 2px solid {decision_color}; 
-                        border-radius: 10px; color: {decision_color}; font-size: 24px; font-weight: bold;'>
-                {decision}
-            </div>
-        """, unsafe_allow_html=True)
-
-    # Afficher les informations du client et la décision
-    if data:
-        # Visualisation de la probabilité sous forme de compteur
-        st.write("### Visualisation de la Probabilité de Défaut")
-        st.markdown(""" Le compteur indique la probabilité (en pourcentage) que le client puisse faire défaut,
-        c'est à dire qu'il ne rembourse pas son prêt.
-        Nous considérons que si la probabilité de défaut dépasse 36%, le risque de ne pas rembourser le crédit
-        est trop important pour la société. Si le client, indiqué par la bande noire sur le compteur, est situé
-        en zone bleue, il remboursera probablement son prêt. S'il se situe en zone rose, le client ne remboursera probablement
-        pas son prêt. Le nombre noir
-        indiqué au milieu du graphique indique la valeur de la probabilité de défaut du client. Le nombre inscrit
-        en vert indique la différence entre la valeur seuil de risque et la valeur de probabilité de défaut du client.  
-        ---  
-        Si le client se situe proche du seuil de décision, vous pouvez regarder en détail les caractéristiques 
-        du client qui ont contribué à cette décision grâce à la figure des contributions des caractéristiques 
-        ci-dessous et réévaluer votre décision. """)
-
-        
-
-        fig_gauge = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=probability * 100,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Probabilité de Défaut", 'font': {'size': 24}},
-            delta={'reference': 36, 'font': {'size': 20}},
-            number={'font': {'size': 60, 'color': 'black'}},
-            gauge={
-                'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue", 'tickfont': {'size': 20}},
-                'bar': {'color': "black"},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [0, 36], 'color': '#008BFB'},  # Couleur pour en dessous du seuil
-                    {'range': [36, 100], 'color': '#FF005E'}  # Couleur pour au-dessus du seuil
-                ],
-                'threshold': {
-                    'line': {'color': "darkblue", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 36
+
+            # -------------------------------------------------------------------------------------
+            # Affichage de la décision d'octroi de crédit
+
+            decision_color = "#008BFB" if decision == "Crédit accordé" else "#FF005E"
+            st.markdown(f"""
+                <div style='display: inline-block; padding: 10px 20px; border: 2px solid {decision_color}; 
+                            border-radius: 10px; color: {decision_color}; font-size: 24px; font-weight: bold;'>
+                    {decision}
+                </div>
+            """, unsafe_allow_html=True)
+
+            # Visualisation de la probabilité sous forme de compteur
+            st.write("### Visualisation de la Probabilité de Défaut")
+            st.markdown(""" Le compteur indique la probabilité (en pourcentage) que le client puisse faire défaut,
+            c'est à dire qu'il ne rembourse pas son prêt.
+            Nous considérons que si la probabilité de défaut dépasse 36%, le risque de ne pas rembourser le crédit
+            est trop important pour la société. Si le client, indiqué par la bande noire sur le compteur, est situé
+            en zone bleue, il remboursera probablement son prêt. S'il se situe en zone rose, le client ne remboursera probablement
+            pas son prêt. Le nombre noir
+            indiqué au milieu du graphique indique la valeur de la probabilité de défaut du client. Le nombre inscrit
+            en vert indique la différence entre la valeur seuil de risque et la valeur de probabilité de défaut du client.  
+            ---  
+            Si le client se situe proche du seuil de décision, vous pouvez regarder en détail les caractéristiques 
+            du client qui ont contribué à cette décision grâce à la figure des contributions des caractéristiques 
+            ci-dessous et réévaluer votre décision. """)
+
+            fig_gauge = go.Figure(go.Indicator(
+                mode="gauge+number+delta",
+                value=probability * 100,
+                domain={'x': [0, 1], 'y': [0, 1]},
+                title={'text': "Probabilité de Défaut", 'font': {'size': 24}},
+                delta={'reference': 36, 'font': {'size': 20}},
+                number={'font': {'size': 60, 'color': 'black'}},
+                gauge={
+                    'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue", 'tickfont': {'size': 20}},
+                    'bar': {'color': "black"},
+                    'bgcolor': "white",
+                    'borderwidth': 2,
+                    'bordercolor': "gray",
+                    'steps': [
+                        {'range': [0, 36], 'color': '#008BFB'},  # Couleur pour en dessous du seuil
+                        {'range': [36, 100], 'color': '#FF005E'}  # Couleur pour au-dessus du seuil
+                    ],
+                    'threshold': {
+                        'line': {'color': "darkblue", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 36
+                    }
                 }
-            }
-        ))
+            ))
 
-        # Afficher le compteur dans Streamlit
-        st.plotly_chart(fig_gauge)
+            # Afficher le compteur dans Streamlit
+            st.plotly_chart(fig_gauge)
 
-        #------------------------------------------------------------------------------------------
-        # VISUALISATION DES IMPORTANCES LOCALES
+            #------------------------------------------------------------------------------------------
+            # VISUALISATION DES IMPORTANCES LOCALES
 
-        # Afficher le plot SHAP si les valeurs sont disponibles
-        if shap_values is not None:
             st.write("### Contribution des caractéristiques du client")
-            st.markdown("""  
-            La figure montre les principales caractéristiques du client qui ont contribué à la décision d'octroi de crédit.
+            st.markdown(f"""
+            La figure montre les {TOP_K_SHAP} principales caractéristiques du client qui ont contribué à la décision d'octroi de crédit.
             Les caractéristiques roses ont contribué à augmenter la probabilité de défaut du client
             tandis que les caractéristiques bleues ont contribué en la faveur de l'octroi du crédit au client.""")
 
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmpfile:
-                shap.force_plot(0, shap_values, features, matplotlib=True, show=False)
-                plt.savefig(tmpfile.name, bbox_inches='tight', dpi=300)
-                plt.close()
-
-            st.image(tmpfile.name)
-        else:
-            st.error("Erreur lors de la récupération des valeurs SHAP.")
+            with st.spinner("Calcul des contributions des caractéristiques..."):
+                shap_data = wait_result(shap_future)
+
+            if shap_data is not None:
+                # Contributions triées par valeur absolue décroissante par l'API: la plus forte est affichée en haut
+                features = shap_data["shap_values"]["features"][::-1]
+                shap_values = np.array(shap_data["shap_values"]["shap_values"][::-1])
+                colors = np.where(shap_values > 0, '#FF005E', '#008BFB')
+
+                fig_shap, ax_shap = plt.subplots(figsize=(10, 0.4 * len(features) + 1))
+                ax_shap.barh(features, shap_values, color=colors)
+                ax_shap.axvline(0, color='black', linewidth=1)
+                ax_shap.set_xlabel("Contribution SHAP (log-odds)")
+                st.pyplot(fig_shap)
+                plt.close(fig_shap)
+            else:
+                st.error("Erreur lors de la récupération des valeurs SHAP.")
 
 
 
@@ -260,11 +312,61 @@ if selection == "Le client: décision d'octroi de crédit":
 # - Figure de la distribution des clients ayant remboursé leur prêt
 # - Figure de la distribution des clients n'ayant pas remboursé leur prêt.
 # La situation du client concerné par l'analyse est indiquée par une ligne verticale.
-
-
-elif selection == "Distribution des Caractéristiques":
+# Les histogrammes sont pré-agrégés par l'API: le coût d'affichage ne dépend pas du nombre de clients.
+
+
+# Fragment: changer de caractéristique ne réexécute que cette partie de la page
+@st.fragment
+def render_distribution(summary, client_values, client_id):
+    # Menu déroulant pour sélectionner une feature à visualiser
+    selected_feature = st.selectbox("Sélectionnez une variable à visualiser", summary["top_10_features"])
+    histogram = summary["histograms"][selected_feature]
+
+    # Obtenir la valeur de la feature pour le client sélectionné (récupéré dans l'onglet 1)
+    client_value = None
+    if client_values is not None:
+        client_value = client_values.get(selected_feature)
+
+    # Afficher l'histogramme si des valeurs valides sont disponibles
+    if not histogram["all"]:
+        st.error(f"Aucune donnée valide disponible pour la feature '{selected_feature}'.")
+        return
+
+    bin_edges = histogram["bin_edges"]
+    panels = [
+        ("all", 'skyblue', "Tous les clients"),
+        ("target_0", '#008BFB', "clients au crédit remboursé"),
+        ("target_1", '#FF005E', "clients en défaut"),
+    ]
+
+    # Figure de la distribution globale, puis deux sous-plots pour TARGET=0 et TARGET=1
+    fig_global, ax_global = plt.subplots(figsize=(10, 6))
+    fig, (ax_target_0, ax_target_1) = plt.subplots(1, 2, figsize=(15, 6))
+
+    for ax, (key, color, label) in zip([ax_global, ax_target_0, ax_target_1], panels):
+        ax.stairs(histogram[key], bin_edges, fill=True, color=color, edgecolor='black')
+        ax.set_title(f"Distribution de {selected_feature} ({label})")
+        ax.set_xlabel(selected_feature)
+        ax.set_ylabel("Fréquence")
+
+        # Ajouter une ligne verticale pour représenter la valeur du client
+        if client_value is not None:
+            ax.axvline(x=client_value, color='red', linestyle='--', label=f"Client ID {client_id}", linewidth=2)
+            ax.legend()
+
+    # Afficher la figure de la distribution globale dans Streamlit
+    st.pyplot(fig_global)
+    plt.close(fig_global)
+
+    # Ajustement de la mise en page pour les sous-plots et affichage dans Streamlit
+    fig.tight_layout()
+    st.pyplot(fig)
+    plt.close(fig)
+
+
+if selection == "Distribution des Caractéristiques":
     st.header("Distribution des Caractéristiques")
-    st.markdown("""
+    st.markdown("""  
         Choisissez une des 10 caractéristiques les plus importantes du modèle
         afin de visualiser la distribution de tous les clients, celle des clients ayant remboursé leur
         crédit, et celle des clients en défaut. La ligne verticale indique la position du client par 
@@ -273,100 +375,25 @@ elif selection == "Distribution des Caractéristiques":
 
     #---------------------------------------------------------------------------------------------
     # Vérifier si 'client_id' est dans st.session_state
-    if 'client_id' not in st.session_state:
+    client_id = st.session_state.get('client_id')  # Récupérer client_id depuis session_state
+    if not client_id:
         st.error("Veuillez entrer un ID client dans l'onglet 'Le client'.")
-    else:
-        client_id = st.session_state['client_id']  # Récupérer client_id depuis session_state
     #---------------------------------------------------------------------------------------------
 
-    # Récupérer les données des 10 features les plus importantes via l'API
-    feature_data_endpoint = f"{api_url}/feature-data"
-    response = requests.get(feature_data_endpoint)
-
-    if response.status_code == 200:
-        # Récupérer les données JSON renvoyées par l'API
-        data = response.json()
-        top_10_features = data["top_10_features"]
-        feature_data = data["feature_data"]
-        target_data = data["target"]
-
-        # Menu déroulant pour sélectionner une feature à visualiser
-        selected_feature = st.selectbox("Sélectionnez une variable à visualiser", top_10_features)
-
-        # Obtenir les données de la feature sélectionnée
-        feature_values = feature_data[selected_feature]
-
-        # Filtrer les valeurs None avant de tracer l'histogramme
-        cleaned_feature_values = [value for value in feature_values if value is not None]
-
-        # Obtenir la valeur de la feature pour le client sélectionné (récupéré dans l'onglet 1)
-        client_value = None
-        if client_id:
-            client_endpoint = f"{api_url}/client/{client_id}"
-            client_response = requests.get(client_endpoint)
-
-            if client_response.status_code == 200:
-                client_data = client_response.json()
-
-                # Récupérer la valeur de la feature sélectionnée pour le client
-                try:
-                    client_value = client_data["client_feature_values"][selected_feature]
-                except KeyError:
-                    st.error(f"La feature sélectionnée '{selected_feature}' n'existe pas dans les données du client.")
-                    client_value = None
+    # Lancer la requête du client pendant la récupération des données pré-agrégées (en cache)
+    client_future = fetch_client_values(client_id)
+    summary = get_feature_summary()
+
+    if summary is not None:
+        client_values = None
+        if client_future is not None:
+            client_data = wait_result(client_future)
+            if client_data is not None:
+                client_values = client_data["client_feature_values"]
             else:
                 st.error("Erreur lors de la récupération des informations du client.")
 
-        # Afficher l'histogramme si des valeurs valides sont disponibles
-        if cleaned_feature_values:
-            # Créer une figure pour la distribution globale
-            fig_global, ax_global = plt.subplots(figsize=(10, 6))
-            ax_global.hist(cleaned_feature_values, bins=30, color='skyblue', edgecolor='black')
-            ax_global.set_title(f"Distribution de {selected_feature} (Tous les clients)")
-            ax_global.set_xlabel(selected_feature)
-            ax_global.set_ylabel("Fréquence")
-
-            # Ajouter une ligne verticale pour représenter la valeur du client dans la distribution globale
-            if client_value is not None:
-                ax_global.axvline(x=client_value, color='red', linestyle='--', label=f"Client ID {client_id}", linewidth=2)
-                ax_global.legend()
-
-            # Afficher la figure de la distribution globale dans Streamlit
-            st.pyplot(fig_global)
-
-            # Créer une figure avec deux sous-plots pour TARGET=0 et TARGET=1
-            fig, (ax_target_0, ax_target_1) = plt.subplots(1, 2, figsize=(15, 6))
-
-            # Distribution pour TARGET=0
-            target_0_values = [value for value, target in zip(feature_values, target_data) if target == 0 and value is not None]
-            ax_target_0.hist(target_0_values, bins=30, color='#008BFB', edgecolor='black')
-            ax_target_0.set_title(f"Distribution de {selected_feature} (clients au crédit remboursé)")
-            ax_target_0.set_xlabel(selected_feature)
-            ax_target_0.set_ylabel("Fréquence")
-
-            if client_value is not None:
-                ax_target_0.axvline(x=client_value, color='red', linestyle='--', label=f"Client ID {client_id}", linewidth=2)
-                ax_target_0.legend()
-
-            # Distribution pour TARGET=1
-            target_1_values = [value for value, target in zip(feature_values, target_data) if target == 1 and value is not None]
-            ax_target_1.hist(target_1_values, bins=30, color='#FF005E', edgecolor='black')
-            ax_target_1.set_title(f"Distribution de {selected_feature} (clients en défaut)")
-            ax_target_1.set_xlabel(selected_feature)
-            ax_target_1.set_ylabel("Fréquence")
-
-            if client_value is not None:
-                ax_target_1.axvline(x=client_value, color='red', linestyle='--', label=f"Client ID {client_id}", linewidth=2)
-                ax_target_1.legend()
-
-            # Ajustement de la mise en page pour les sous-plots
-            plt.tight_layout()
-
-            # Afficher les sous-plots dans Streamlit
-            st.pyplot(fig)
-        else:
-            st.error(f"Aucune donnée valide disponible pour la feature '{selected_feature}'.")
-
+        render_distribution(summary, client_values, client_id)
     else:
         st.error("Erreur lors de la récupération des données de features.")
 
@@ -389,9 +416,69 @@ elif selection == "Distribution des Caractéristiques":
 # - Figure de la distribution des clients ayant remboursé leur prêt
 # - Figure de la distribution des clients n'ayant pas remboursé leur prêt.
 # La situation du client concerné par l'analyse est indiquée par une croix rouge.
+# Les nuages de points sont tracés sur un échantillon de taille fixe fourni par l'API.
+
+
+# Fragment: changer de caractéristiques ne réexécute que cette partie de la page
+@st.fragment
+def render_bivariate(summary, client_values, client_id):
+    top_10_features = summary["top_10_features"]
+
+    # Sélectionner deux features parmi les top 10
+    selected_feature_x = st.selectbox("Sélectionnez la première feature (axe X)", top_10_features, key="x_feature")
+    selected_feature_y = st.selectbox("Sélectionnez la deuxième feature (axe Y)", top_10_features, key="y_feature")
+
+    # Valeurs X et Y de l'échantillon, sans valeurs manquantes
+    values_x = np.array(summary["sample"]["values"][selected_feature_x], dtype=float)
+    values_y = np.array(summary["sample"]["values"][selected_feature_y], dtype=float)
+    target = np.array(summary["sample"]["target"], dtype=float)
+    valid = np.isfinite(values_x) & np.isfinite(values_y)
+
+    if not valid.any():
+        st.error(f"Aucune donnée valide disponible pour les features '{selected_feature_x}' et '{selected_feature_y}'.")
+        return
+
+    # Valeurs X et Y du client (initialisées pour le cas où aucun client n'est sélectionné)
+    client_value_x = None
+    client_value_y = None
+    if client_values is not None:
+        client_value_x = client_values.get(selected_feature_x)
+        client_value_y = client_values.get(selected_feature_y)
 
+    st.caption(f"Échantillon de {int(valid.sum())} clients sur {summary['n_clients']}.")
 
-elif selection == "Analyse Bi-variée":
+    panels = [
+        (valid, 'skyblue', "Tous les clients"),
+        (valid & (target == 0), '#008BFB', "clients au crédit remboursé"),
+        (valid & (target == 1), '#FF005E', "clients en défaut"),
+    ]
+
+    # Scatter plot global, puis deux sous-plots pour TARGET=0 et TARGET=1
+    fig_global, ax_global = plt.subplots(figsize=(10, 6))
+    fig, (ax_target_0, ax_target_1) = plt.subplots(1, 2, figsize=(15, 6))
+
+    for ax, (mask, color, label) in zip([ax_global, ax_target_0, ax_target_1], panels):
+        ax.scatter(values_x[mask], values_y[mask], color=color, edgecolor='black', alpha=0.7, rasterized=True)
+        ax.set_title(f"Scatter Plot entre {selected_feature_x} et {selected_feature_y} ({label})")
+        ax.set_xlabel(selected_feature_x)
+        ax.set_ylabel(selected_feature_y)
+
+        # Ajouter un point pour le client spécifique
+        if client_value_x is not None and client_value_y is not None:
+            ax.scatter(client_value_x, client_value_y, color='red', label=f"Client ID {client_id}", s=200, edgecolor='black', marker='X')
+            ax.legend()
+
+    # Afficher le scatter plot global dans Streamlit
+    st.pyplot(fig_global)
+    plt.close(fig_global)
+
+    # Ajuster la mise en page et afficher les sous-plots
+    fig.tight_layout()
+    st.pyplot(fig)
+    plt.close(fig)
+
+
+if selection == "Analyse Bi-variée":
     st.header("Analyse Bi-variée des Caractéristiques")
     st.write("""Sélectionnez deux caractéristiques parmi les 10 caractéristiques les plus importantes 
     pour visualiser un scatter plot de tous les clients, des clients ayant remboursé leur prêt ou des 
@@ -400,115 +487,25 @@ elif selection == "Analyse Bi-variée":
 
     #---------------------------------------------------------------------------------------------
     # Vérifier si 'client_id' est dans st.session_state
-    if 'client_id' not in st.session_state:
+    client_id = st.session_state.get('client_id')  # Récupérer client_id depuis session_state
+    if not client_id:
         st.error("Veuillez entrer un ID client dans l'onglet 'Le client'.")
-    else:
-        client_id = st.session_state['client_id']  # Récupérer client_id depuis session_state
     #---------------------------------------------------------------------------------------------
 
-    # Récupérer les données des 10 features les plus importantes via l'API
-    feature_data_endpoint = f"{api_url}/feature-data"
-    response = requests.get(feature_data_endpoint)
-
-    if response.status_code == 200:
-        # Récupérer les données JSON renvoyées par l'API
-        data = response.json()
-        top_10_features = data["top_10_features"]
-        feature_data = data["feature_data"]
-        target_data = data["target"]  # Récupérer les données target
-
-        # Sélectionner deux features parmi les top 10
-        selected_feature_x = st.selectbox("Sélectionnez la première feature (axe X)", top_10_features, key="x_feature")
-        selected_feature_y = st.selectbox("Sélectionnez la deuxième feature (axe Y)", top_10_features, key="y_feature")
-
-        # Obtenir les valeurs des deux features sélectionnées
-        feature_values_x = feature_data[selected_feature_x]
-        feature_values_y = feature_data[selected_feature_y]
-
-        # Filtrer les valeurs None dans les deux features
-        cleaned_values = [
-            (x, y, target) for x, y, target in zip(feature_values_x, feature_values_y, target_data)
-            if x is not None and y is not None
-        ]
-
-        if cleaned_values:
-            # Séparer les valeurs X et Y après le nettoyage
-            cleaned_feature_values_x, cleaned_feature_values_y, cleaned_target = zip(*cleaned_values)
-
-            # Initialiser le scatter plot global
-            fig_global, ax_global = plt.subplots(figsize=(10, 6))
-            ax_global.scatter(cleaned_feature_values_x, cleaned_feature_values_y, color='skyblue', edgecolor='black', alpha=0.7)
-            ax_global.set_title(f"Scatter Plot entre {selected_feature_x} et {selected_feature_y} (Tous les clients)")
-            ax_global.set_xlabel(selected_feature_x)
-            ax_global.set_ylabel(selected_feature_y)
-
-            # Ajouter un point pour le client spécifique dans le graphique global
-            if client_id:
-                client_endpoint = f"{api_url}/client/{client_id}"
-                client_response = requests.get(client_endpoint)
-
-                if client_response.status_code == 200:
-                    client_data = client_response.json()
-
-                    # Obtenir les valeurs X et Y pour le client spécifique
-                    try:
-                        client_value_x = client_data["client_feature_values"][selected_feature_x]
-                        client_value_y = client_data["client_feature_values"][selected_feature_y]
-
-                        # Ajouter un point pour le client spécifique
-                        ax_global.scatter(client_value_x, client_value_y, color='red', label=f"Client ID {client_id}", s=200, edgecolor='black', marker='X')
-                        ax_global.legend()
-
-                    except KeyError:
-                        st.error(f"Les features sélectionnées '{selected_feature_x}' et/ou '{selected_feature_y}' n'existent pas dans les données du client.")
-                else:
-                    st.error("Erreur lors de la récupération des informations du client.")
-
-            # Afficher le scatter plot global dans Streamlit
-            st.pyplot(fig_global)
-
-            # Créer deux sous-plots pour TARGET=0 et TARGET=1
-            fig, (ax_target_0, ax_target_1) = plt.subplots(1, 2, figsize=(15, 6))
-
-            # Scatter plot pour TARGET=0 avec des points bleus
-            target_0_values = [
-                (x, y) for x, y, target in zip(cleaned_feature_values_x, cleaned_feature_values_y, cleaned_target)
-                if target == 0
-            ]
-            if target_0_values:
-                target_0_x, target_0_y = zip(*target_0_values)
-                ax_target_0.scatter(target_0_x, target_0_y, color='#008BFB', edgecolor='black', alpha=0.7)
-            ax_target_0.set_title(f"Scatter Plot entre {selected_feature_x} et {selected_feature_y} (clients au crédit remboursé)")
-            ax_target_0.set_xlabel(selected_feature_x)
-            ax_target_0.set_ylabel(selected_feature_y)
-
-            if client_value_x is not None and client_value_y is not None:
-                ax_target_0.scatter(client_value_x, client_value_y, color='red', label=f"Client ID {client_id}", s=200, edgecolor='black', marker='X')
-                ax_target_0.legend()
-
-            # Scatter plot pour TARGET=1 avec des points roses
-            target_1_values = [
-                (x, y) for x, y, target in zip(cleaned_feature_values_x, cleaned_feature_values_y, cleaned_target)
-                if target == 1
-            ]
-            if target_1_values:
-                target_1_x, target_1_y = zip(*target_1_values)
-                ax_target_1.scatter(target_1_x, target_1_y, color='#FF005E', edgecolor='black', alpha=0.7)
-            ax_target_1.set_title(f"Scatter Plot entre {selected_feature_x} et {selected_feature_y} (clients en défaut)")
-            ax_target_1.set_xlabel(selected_feature_x)
-            ax_target_1.set_ylabel(selected_feature_y)
-
-            if client_value_x is not None and client_value_y is not None:
-                ax_target_1.scatter(client_value_x, client_value_y, color='red', label=f"Client ID {client_id}", s=200, edgecolor='black', marker='X')
-                ax_target_1.legend()
-
-            # Ajuster la mise en page et afficher les sous-plots
-            plt.tight_layout()
-            st.pyplot(fig)
+    # Lancer la requête du client pendant la récupération des données pré-agrégées (en cache)
+    client_future = fetch_client_values(client_id)
+    summary = get_feature_summary()
 
-        else:
-            st.error(f"Aucune donnée valide disponible pour les features '{selected_feature_x}' et '{selected_feature_y}'.")
+    if summary is not None:
+        client_values = None
+        if client_future is not None:
+            client_data = wait_result(client_future)
+            if client_data is not None:
+                client_values = client_data["client_feature_values"]
+            else:
+                st.error("Erreur lors de la récupération des informations du client.")
 
+        render_bivariate(summary, client_values, client_id)
     else:
         st.error("Erreur lors de la récupération des données de features.")
 
@@ -533,15 +530,10 @@ elif selection == "Le modèle global":
     st.write("""L'histogramme représente les 10 plus importantes caractéristiques qui ont contribuées
     à l'élaboration du modèle de prédiction de défaut du client. """)
 
-    # Construire l'URL de l'API pour récupérer la feature importance
-    feature_importance_endpoint = f"{api_url}/feature-importance"
-    
-    # Envoyer une requête GET pour obtenir les 10 features les plus importantes
-    feature_response = requests.get(feature_importance_endpoint)
-    
-    if feature_response.status_code == 200:
-        # Récupérer les données JSON renvoyées par l'API
-        feature_data = feature_response.json()
+    # Récupérer les 10 features les plus importantes (mises en cache côté interface)
+    feature_data = get_feature_importance()
+
+    if feature_data is not None:
         feature_importance = pd.DataFrame(feature_data["top_10_feature_importance"])
 
         # Afficher le tableau des features importantes
@@ -579,25 +571,32 @@ elif selection == "Le modèle global":
 
 elif selection == "Description des caractéristiques":
     st.header("Description des caractéristiques")
-    st.write("Sélectionnez une caractéristique pour voir sa description en anglais.")
+    st.write("Recherchez une caractéristique (nom, table ou mots de la description) pour voir sa description en anglais.")
 
-    # Récupérer les données de description via l'API
-    description_endpoint = f"{api_url}/column-description"
-    response = requests.get(description_endpoint)
+    # Recherche côté API: seuls les résultats et la description choisie sont téléchargés
+    query = st.text_input("Rechercher une caractéristique", placeholder="ex: EXT_SOURCE, annuity, bureau")
 
-    if response.status_code == 200:
-        # Extraire les données
-        data = response.json()
-        columns_description = data['columns_description']
+    if query:
+        search_data = fetch_json("/column-description/search", {"q": query})
 
-        # Créer un dictionnaire pour associer les noms des variables à leurs descriptions
-        columns_dict = {item['Row']: item['Description'] for item in columns_description}
+        if search_data is not None:
+            results = search_data["results"]
 
-        # Créer un menu déroulant pour choisir une variable
-        selected_variable = st.selectbox("Sélectionnez une variable", list(columns_dict.keys()))
+            if results:
+                # Créer un menu déroulant avec les variables trouvées (une même variable peut exister dans plusieurs tables)
+                selected_variable = st.selectbox("Sélectionnez une variable", list(dict.fromkeys(result["Row"] for result in results)))
 
-        # Afficher la description de la variable sélectionnée
-        st.write(f"### Description de {selected_variable}")
-        st.write(columns_dict[selected_variable])
-    else:
-        st.error("Erreur lors de la récupération des données de description des colonnes.")
\ No newline at end of file
+                # Récupérer uniquement la description de la variable sélectionnée
+                description_data = fetch_json(f"/column-description/{selected_variable}")
+
+                if description_data is not None:
+                    # Afficher la description de la variable sélectionnée, pour chaque table où elle apparaît
+                    st.write(f"### Description de {selected_variable}")
+                    for entry in description_data["descriptions"]:
+                        st.write(f"**{entry['Table']}**: {entry['Description']}")
+                else:
+                    st.error("Erreur lors de la récupération de la description de la variable.")
+            else:
+                st.info("Aucune caractéristique ne correspond à la recherche.")
+        else:
+            st.error("Erreur lors de la récupération des données de description des colonnes.")
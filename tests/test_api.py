@@ -3,7 +3,16 @@ import os
 # Ajouter le chemin du dossier "BACKEND_FRONTEND" au sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from fastapi.testclient import TestClient
-from api.main import app  # Importe l'application FastAPI
+import numpy as np
+import pandas as pd
+import subprocess
+import tempfile
+
+# Cache de résultats isolé pour les tests (ni partagé avec un serveur local, ni conservé d'une exécution à l'autre)
+os.environ["RESULT_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "results.sqlite")
+
+from api.main_projet8 import app, data_path, load_resources, warm_up, load_client_data, infer_column_dtype, to_model_input  # Importe l'application FastAPI
+from api.result_cache import ResultCache
 
 # Créer un client de test pour simuler les requêtes HTTP à l'API
 client = TestClient(app)
@@ -37,4 +46,244 @@ def test_get_feature_importance():
     # Vérifier que la réponse contient bien les top 10 features
     json_response = response.json()
     assert "top_10_feature_importance" in json_response
-    assert len(json_response["top_10_feature_importance"]) == 10
\ No newline at end of file
+    assert len(json_response["top_10_feature_importance"]) == 10
+
+# Test 4: Vérifier que le chargement compact réduit la mémoire sans changer les prédictions
+def test_compact_loading_parity():
+    model = load_resources()["model"]
+    raw_df = pd.read_csv(data_path)
+    compact_df, schema, memory_report = load_client_data(data_path)
+
+    # Chargement compact sans perte: mêmes valeurs, empreinte mémoire jamais supérieure. Le gain dépend des
+    # données (indicateurs, comptages, montants exacts en float32, colonnes majoritairement vides)
+    assert memory_report["compact_bytes"] <= memory_report["raw_bytes"]
+    assert set(schema) == set(raw_df.columns)
+    pd.testing.assert_frame_equal(to_model_input(compact_df).astype(raw_df.dtypes.to_dict()), raw_df)
+
+    # Mêmes prédictions à partir des données brutes et des données compactes
+    raw_features = raw_df.drop(columns=["SK_ID_CURR", "TARGET"])
+    compact_features = to_model_input(compact_df.drop(columns=["SK_ID_CURR", "TARGET"]))
+    raw_proba = model.predict_proba(raw_features)[:, 1]
+    compact_proba = model.predict_proba(compact_features)[:, 1]
+    np.testing.assert_array_equal(compact_proba, raw_proba)
+    assert ((raw_proba < 0.36) == (compact_proba < 0.36)).all()
+
+
+# Test 4 bis: Vérifier que les valeurs infinies ne conduisent pas à un type entier
+def test_infer_column_dtype_with_inf():
+    assert infer_column_dtype(pd.Series([0., 1., np.inf])) == "float32"
+    assert infer_column_dtype(pd.Series([0., 1., 2.])) == "int8"
+
+# Test 4 ter: Vérifier que le type compact ne perd aucune valeur
+def test_infer_column_dtype_is_lossless():
+    assert infer_column_dtype(pd.Series([107162.5955696275, np.nan])) == "float64"
+    assert infer_column_dtype(pd.Series([0.5, 202500.0, np.nan])) == "float32"
+    assert infer_column_dtype(pd.Series([0, 2**40])) == "int64"
+
+# Test 4 quater: Vérifier la réduction mémoire sur des colonnes typiques (indicateurs, montants, agrégats vides)
+def test_compact_loading_memory(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 1000
+    aggregate = rng.normal(size=n)
+    aggregate[rng.random(n) < 0.8] = np.nan
+    path = tmp_path / "sample.csv"
+    pd.DataFrame({
+        "SK_ID_CURR": np.arange(n),
+        "FLAG_OWN_CAR": rng.integers(0, 2, n),
+        "DAYS_BIRTH": rng.integers(-25000, -7000, n),
+        "AMT_CREDIT": rng.integers(1, 400, n) * 2250.0,
+        "AMT_BALANCE_mean": aggregate,
+    }).to_csv(path, index=False)
+
+    raw_df = pd.read_csv(path)
+    compact_df, schema, memory_report = load_client_data(path)
+    assert memory_report["compact_bytes"] <= 0.5 * memory_report["raw_bytes"]
+    assert schema["AMT_BALANCE_mean"] == "Sparse[float64, nan]"
+    pd.testing.assert_frame_equal(to_model_input(compact_df).astype(raw_df.dtypes.to_dict()), raw_df)
+
+# Test 5: Vérifier que le suivi de dérive n'est mis à jour que par un scoring signalé (monitor=true)
+def test_drift_monitoring():
+    before = client.get("/monitoring/drift").json()
+
+    # Les simples consultations et les vecteurs modifiés ne sont pas comptés
+    client.get("/client/346699")
+    client.get("/client/346699", params={"fields": "client_feature_values"})
+    client.post("/clients", json={"client_ids": [346699]})
+    client.post("/score", json={"client_id": -1, "features": {"EXT_SOURCE_1": 0.5}})
+    assert client.get("/monitoring/drift").json()["requests"] == before["requests"]
+
+    client.get("/client/346699", params={"monitor": True})
+    response = client.get("/monitoring/drift")
+    assert response.status_code == 200
+
+    json_response = response.json()
+    assert json_response["requests"] == before["requests"] + 1
+    assert len(json_response["features"]) == 10
+    probability_stats = json_response["probability_of_default"]
+    assert probability_stats["count"] == before["probability_of_default"]["count"] + 1
+    assert probability_stats["psi"] is not None
+    assert sum(probability_stats["histogram"]) == probability_stats["count"]
+
+
+# Test 6: Vérifier que shap n'est pas importé au chargement de l'API (démarrage à froid rapide)
+def test_shap_is_imported_lazily():
+    root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, api.main_projet8; print('shap' in sys.modules)"],
+        cwd=root_path, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+# Test 7: Vérifier que l'API est prête après le warm-up
+def test_ready_after_warmup():
+    with TestClient(app) as lifespan_client:
+        response = lifespan_client.get("/_ah/warmup")
+        assert response.status_code == 200
+
+        response = lifespan_client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+
+# Test 7 bis: Vérifier qu'une erreur de chargement passée n'est plus signalée une fois le chargement réussi
+def test_ready_clears_stale_error():
+    resources = load_resources()
+    explainer = resources.pop("explainer", None)
+    resources["error"] = "previous failure"
+    try:
+        warm_up()
+        json_response = client.get("/ready").json()
+        assert json_response["ready"] is True
+        assert "error" not in json_response
+    finally:
+        resources.pop("error", None)
+        if explainer is not None:
+            resources.setdefault("explainer", explainer)
+
+
+# Test 8: Vérifier la recherche dans les descriptions des features
+def test_search_column_description():
+    response = client.get("/column-description/search", params={"q": "ext sour"})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [result["Row"] for result in results[:3]] == ["EXT_SOURCE_1", "EXT_SOURCE_2", "EXT_SOURCE_3"]
+
+# Test 9: Vérifier l'accès direct à une feature présente dans plusieurs tables
+def test_get_column_description_by_row():
+    response = client.get("/column-description/AMT_CREDIT")
+    assert response.status_code == 200
+    tables = {entry["Table"] for entry in response.json()["descriptions"]}
+    assert tables == {"application_{train|test}.csv", "previous_application.csv"}
+
+    response = client.get("/column-description/UNKNOWN_FEATURE")
+    assert response.status_code == 404
+
+
+# Test 10: Vérifier que top_k renvoie les k plus fortes contributions SHAP du vecteur complet
+def test_get_client_info_top_k():
+    full_response = client.get("/client/346699").json()
+    full_shap = dict(zip(full_response["shap_values"]["features"], full_response["shap_values"]["shap_values"]))
+
+    response = client.get("/client/346699", params={"top_k": 5})
+    assert response.status_code == 200
+
+    json_response = response.json()
+    top_features = json_response["shap_values"]["features"]
+    expected_features = sorted(full_shap, key=lambda feature: -abs(full_shap[feature]))[:5]
+    assert top_features == expected_features
+    assert list(json_response["client_feature_values"]) == top_features
+    assert json_response["shap_values"]["base_value"] == full_response["shap_values"]["base_value"]
+
+# Test 11: Vérifier la sélection des champs de la réponse
+def test_get_client_info_fields():
+    response = client.get("/client/346699", params={"fields": "probability_of_default,decision"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"client_id", "probability_of_default", "decision"}
+
+    # Sans valeurs SHAP demandées, un vecteur absent du cache est seulement prédit (pas de calcul SHAP ni d'écriture)
+    before = client.get("/monitoring/cache").json()
+    response = client.post("/score", json={"client_id": 346699, "features": {"EXT_SOURCE_2": 0.654321}, "fields": "decision"})
+    assert set(response.json()) == {"client_id", "decision"}
+    assert client.get("/monitoring/cache").json()["writes"] == before["writes"]
+
+    response = client.get("/client/346699", params={"fields": "unknown"})
+    assert response.status_code == 422
+
+# Test 12: Vérifier l'endpoint batch
+def test_get_clients_info_batch():
+    response = client.post("/clients", json={"client_ids": [346699, -1], "top_k": 3})
+    assert response.status_code == 200
+
+    json_response = response.json()
+    assert [result["client_id"] for result in json_response["clients"]] == [346699]
+    assert len(json_response["clients"][0]["shap_values"]["features"]) == 3
+    assert json_response["not_found"] == [-1]
+
+
+# Test 13: Vérifier le scoring d'un client modifié et la mise en cache du résultat
+def test_score_overridden_features_is_cached():
+    payload = {"client_id": 346699, "features": {"EXT_SOURCE_1": 0.123456, "AMT_CREDIT": None}, "top_k": 5}
+    first = client.post("/score", json=payload)
+    assert first.status_code == 200
+
+    before = client.get("/monitoring/cache").json()
+    second = client.post("/score", json=payload)
+    after = client.get("/monitoring/cache").json()
+    assert second.json() == first.json()
+    assert after["memory_hits"] == before["memory_hits"] + 1
+    assert after["misses"] == before["misses"]
+
+    response = client.post("/score", json={"features": {"UNKNOWN_FEATURE": 1.0}})
+    assert response.status_code == 422
+
+# Test 14: Vérifier la persistance sur disque et l'éviction par taille du cache
+def test_result_cache_persistence_and_eviction(tmp_path):
+    cache_path = str(tmp_path / "results.sqlite")
+    cache = ResultCache(cache_path, memory_entries=2, max_disk_bytes=10_000)
+    for index in range(20):
+        cache.put(f"key-{index}", 0.5, 0.1, np.full(100, index, dtype=np.float64))
+    cache.evict()
+
+    report = cache.report()
+    assert report["memory_entries"] == 2
+    assert report["disk_bytes"] <= 10_000
+    assert report["evictions"] > 0
+
+    # Un nouveau cache sur le même fichier (redémarrage) retrouve les entrées récentes depuis le disque
+    restarted = ResultCache(cache_path, memory_entries=2, max_disk_bytes=10_000)
+    probability, base_value, shap_values = restarted.get("key-19")
+    assert probability == 0.5 and base_value == 0.1
+    assert shap_values[0] == 19
+    assert restarted.get("key-0") is None
+    assert restarted.report()["disk_hits"] == 1
+
+# Test 14 bis: Vérifier qu'une entrée servie par le LRU mémoire n'est pas évincée en premier
+def test_result_cache_memory_hits_refresh_last_access(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite"), memory_entries=100, max_disk_bytes=10**9)
+    for index in range(10):
+        cache.put(f"key-{index}", 0.5, 0.1, np.zeros(100))
+    cache.get("key-0")  # hit mémoire sur l'entrée la plus ancienne
+
+    cache.max_disk_bytes = cache.report()["disk_bytes"] // 2
+    cache.evict()
+    assert cache.get("key-0") is not None
+    assert cache.get("key-1") is None
+
+
+# Test 15: Vérifier les données pré-agrégées pour les graphiques
+def test_get_feature_summary():
+    response = client.get("/feature-summary", params={"bins": 20, "sample_size": 50})
+    assert response.status_code == 200
+
+    json_response = response.json()
+    assert len(json_response["top_10_features"]) == 10
+    assert len(json_response["sample"]["target"]) == min(50, json_response["n_clients"])
+    for feature in json_response["top_10_features"]:
+        histogram = json_response["histograms"][feature]
+        assert len(histogram["all"]) in (0, 20)
+        assert len(json_response["sample"]["values"][feature]) == len(json_response["sample"]["target"])
+
+    # Seuls les paramètres par défaut sont mis en cache côté serveur
+    assert client.get("/feature-summary").status_code == 200
+    assert "feature_summary" in load_resources()
+    assert "feature_summaries" not in load_resources()